@@ -8,27 +8,81 @@ import os
 import secrets
 import re
 import html
-from datetime import datetime, timedelta
-from functools import wraps
-from flask import Flask, render_template, request, jsonify, send_from_directory, session, redirect, url_for
-from werkzeug.utils import secure_filename
+import json
+import hashlib
+import gzip
+import struct
+import threading
+import mimetypes
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, wraps
+from urllib.parse import quote
+from flask import Flask, Response, abort, render_template, request, jsonify, send_from_directory, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
+from itsdangerous import BadData, URLSafeTimedSerializer
+from werkzeug.http import is_resource_modified
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.utils import safe_join, secure_filename
 from PIL import Image
 import time
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+def json_dumps(obj):
+    """Serialize obj to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def json_response(body, status=200):
+    """Wrap pre-serialized JSON bytes in a fresh response"""
+    return Response(body, status=status, mimetype='application/json')
+
 # Simple HTML sanitization without bleach dependency
+_SCRIPT_TAG_RE = re.compile(r'<script[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+_EVENT_HANDLER_RE = re.compile(r'on\w+\s*=', re.IGNORECASE)
+_JAVASCRIPT_URL_RE = re.compile(r'javascript:', re.IGNORECASE)
+
 def clean_html(text):
     """Basic HTML sanitization"""
     if not text:
         return ""
     # Remove script tags and dangerous attributes
-    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.IGNORECASE | re.DOTALL)
-    text = re.sub(r'on\w+\s*=', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'javascript:', '', text, flags=re.IGNORECASE)
+    text = _SCRIPT_TAG_RE.sub('', text)
+    text = _EVENT_HANDLER_RE.sub('', text)
+    text = _JAVASCRIPT_URL_RE.sub('', text)
     return html.escape(text)
 from markupsafe import Markup
 
 # Initialize Flask application
 app = Flask(__name__)
 
+if orjson is not None:
+    class ORJSONProvider(DefaultJSONProvider):
+        """JSON provider backed by orjson, used by jsonify and request.get_json"""
+
+        def dumps(self, obj, **kwargs):
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+
 # Security Configuration
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or secrets.token_urlsafe(32)
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
@@ -40,12 +94,29 @@ app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['WTF_CSRF_ENABLED'] = True
 app.config['WTF_CSRF_TIME_LIMIT'] = 3600  # 1 hour CSRF token validity
 
+# Static upload offloading to the reverse proxy (both off by default)
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '').lower() == 'true'  # Apache/lighttpd
+app.config['X_ACCEL_REDIRECT_PREFIX'] = os.environ.get('X_ACCEL_REDIRECT_PREFIX')  # nginx internal location
+
+# Number of reverse proxies in front of the app whose X-Forwarded-For/-Proto
+# headers are trusted (0 = use the socket address, e.g. when exposed directly)
+app.config['TRUSTED_PROXY_COUNT'] = int(os.environ.get('TRUSTED_PROXY_COUNT', '0'))
+if app.config['TRUSTED_PROXY_COUNT']:
+    app.wsgi_app = ProxyFix(
+        app.wsgi_app,
+        x_for=app.config['TRUSTED_PROXY_COUNT'],
+        x_proto=app.config['TRUSTED_PROXY_COUNT'],
+    )
+
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 
+# Chunk size used when writing uploads to disk (Werkzeug defaults to 16KB)
+UPLOAD_BUFFER_SIZE = 1024 * 1024
+
 # Security patterns for input validation
 DANGEROUS_PATTERNS = [
     r'<script[^>]*>.*?</script>',
@@ -56,30 +127,121 @@ DANGEROUS_PATTERNS = [
     r'@import',
     r'binding\s*:',
 ]
+# One alternation over all patterns; each pattern is its own named group so a
+# match can still be traced back to the pattern that fired
+_DANGEROUS_RE = re.compile(
+    '|'.join(f'(?P<p{index}>{pattern})' for index, pattern in enumerate(DANGEROUS_PATTERNS)),
+    re.IGNORECASE
+)
+
+# Every dangerous pattern (and everything clean_html strips) needs one of these
+_SANITIZE_TRIGGER_RE = re.compile(r'[<=:(@]')
 
 # Allowed HTML tags for sanitization
 ALLOWED_TAGS = ['b', 'i', 'em', 'strong', 'p', 'br']
 ALLOWED_ATTRIBUTES = {}
 
+# Content Security Policy shared by secure_headers and after_request
+CONTENT_SECURITY_POLICY = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline'; "
+    "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
+    "font-src 'self' https://fonts.gstatic.com; "
+    "img-src 'self' data: blob:; "
+    "media-src 'self' blob:; "
+    "connect-src 'self'; "
+    "frame-src 'none';"
+)
+
+# Headers applied by the secure_headers decorator
+SECURE_HEADERS = (
+    ('X-Content-Type-Options', 'nosniff'),
+    ('X-Frame-Options', 'DENY'),
+    ('X-XSS-Protection', '1; mode=block'),
+    ('Strict-Transport-Security', 'max-age=31536000; includeSubDomains'),
+    ('Referrer-Policy', 'strict-origin-when-cross-origin'),
+    ('Content-Security-Policy', CONTENT_SECURITY_POLICY),
+)
+
+# Headers added by after_request to every response
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization,X-CSRFToken',
+    'Access-Control-Allow-Methods': 'GET,PUT,POST,DELETE,OPTIONS',
+    'Access-Control-Allow-Credentials': 'true',
+}
+DEFAULT_SECURITY_HEADERS = {
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '1; mode=block',
+    'Referrer-Policy': 'strict-origin-when-cross-origin',
+}
+
+# Pre-serialized bodies for error responses that never vary
+NO_FILE_JSON = json_dumps({'success': False, 'error': 'No file provided', 'error_code': 'NO_FILE'})
+NO_FILE_SELECTED_JSON = json_dumps({'success': False, 'error': 'No file selected', 'error_code': 'NO_FILE'})
+INVALID_FILE_TYPE_JSON = json_dumps({
+    'success': False,
+    'error': 'Invalid file type. Only JPG and PNG files are allowed.',
+    'error_code': 'INVALID_FILE_TYPE'
+})
+PROCESSING_ERROR_JSON = json_dumps({
+    'success': False,
+    'error': 'File processing failed. Please try again.',
+    'error_code': 'PROCESSING_ERROR'
+})
+NOT_FOUND_JSON = json_dumps({'success': False, 'error': 'Page not found', 'error_code': 'NOT_FOUND'})
+FILE_TOO_LARGE_JSON = json_dumps({'success': False, 'error': 'File too large', 'error_code': 'FILE_TOO_LARGE'})
+INTERNAL_ERROR_JSON = json_dumps({'success': False, 'error': 'Internal server error', 'error_code': 'INTERNAL_ERROR'})
+CSRF_FAILED_JSON = json_dumps({'error': 'CSRF token validation failed'})
+RATE_LIMITED_JSON = json_dumps({'error': 'Rate limit exceeded'})
+INVALID_REQUEST_DATA_JSON = json_dumps({'error': 'Invalid request data'})
+EVENT_TYPE_REQUIRED_JSON = json_dumps({'error': 'Event type is required'})
+SECURITY_EVENT_FAILED_JSON = json_dumps({'error': 'Failed to log security event'})
+
 def allowed_file(filename):
     """Check if file has allowed extension"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# Deletes every ASCII character outside [\w\s.-], path separators included.
+# Only used for ASCII names; anything else goes through the Unicode-aware regex
+_FILENAME_DELETE_TABLE = {
+    code: None for code in range(128)
+    if not (chr(code).isalnum() or chr(code).isspace() or chr(code) in '_.-')
+}
+_FILENAME_UNSAFE_RE = re.compile(r'[^\w\s.-]')
+
+# Longer names bypass the cache so clients cannot pin large keys in memory
+MAX_CACHED_FILENAME_LENGTH = 255
+
+@lru_cache(maxsize=2048)
+def _secure_filename_cached(filename):
+    return secure_filename(filename)
+
+def cached_secure_filename(filename):
+    """secure_filename memoized for clients re-uploading the same names"""
+    if len(filename) > MAX_CACHED_FILENAME_LENGTH:
+        return secure_filename(filename)
+    return _secure_filename_cached(filename)
+
 def sanitize_filename(filename):
     """Sanitize filename to prevent directory traversal and injection"""
     if not filename:
         return 'upload_' + str(int(time.time()))
 
     # Remove dangerous characters
-    filename = re.sub(r'[^\w\s.-]', '', filename)
+    if filename.isascii():
+        filename = filename.translate(_FILENAME_DELETE_TABLE)
+    else:
+        filename = _FILENAME_UNSAFE_RE.sub('', filename)
 
     # Prevent directory traversal
-    filename = filename.replace('..', '').replace('/', '').replace('\\', '')
+    filename = filename.replace('..', '')
 
     # Limit length
     filename = filename[:100]
 
-    return secure_filename(filename)
+    return cached_secure_filename(filename)
 
 def sanitize_input(text):
     """Sanitize user input to prevent XSS and injection attacks"""
@@ -89,11 +251,16 @@ def sanitize_input(text):
     # Convert to string if not already
     text = str(text)
 
+    # Plain text cannot match any pattern below, so escaping is all that's left
+    if not _SANITIZE_TRIGGER_RE.search(text):
+        return html.escape(text)
+
     # Check for dangerous patterns
-    for pattern in DANGEROUS_PATTERNS:
-        if re.search(pattern, text, re.IGNORECASE):
-            app.logger.warning(f'Dangerous pattern detected in input: {pattern}')
-            return ''
+    match = _DANGEROUS_RE.search(text)
+    if match:
+        pattern = DANGEROUS_PATTERNS[int(match.lastgroup[1:])]
+        app.logger.warning(f'Dangerous pattern detected in input: {pattern}')
+        return ''
 
     # Sanitize with simple HTML sanitization
     sanitized = clean_html(text)
@@ -109,7 +276,7 @@ def sanitize_filename_input(filename):
     sanitized = sanitize_filename(filename)
 
     # Ensure it has an extension
-    if not '.' in sanitized:
+    if '.' not in sanitized:
         sanitized += '.jpg'
 
     return sanitized
@@ -123,12 +290,12 @@ def validate_image_file(file):
     if not allowed_file(file.filename):
         return False, 'Invalid file type. Only PNG and JPG files are allowed.'
 
-    # Check file size
-    if len(file.read()) > app.config['MAX_CONTENT_LENGTH']:
-        return False, 'File too large. Maximum size is 16MB.'
-
-    # Reset file pointer
+    # Check file size without reading the upload into memory
+    file.seek(0, os.SEEK_END)
+    file_size = file.tell()
     file.seek(0)
+    if file_size > app.config['MAX_CONTENT_LENGTH']:
+        return False, 'File too large. Maximum size is 16MB.'
 
     try:
         # Validate image content
@@ -144,19 +311,72 @@ def validate_image_file(file):
         app.logger.warning(f'Invalid image file: {str(e)}')
         return False, 'Invalid image file. Please upload a valid PNG or JPG image.'
 
-def generate_csrf_token():
-    """Generate CSRF token for forms"""
-    if 'csrf_token' not in session:
-        session['csrf_token'] = secrets.token_urlsafe(32)
-    return session['csrf_token']
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# JPEG start-of-frame markers (DHT, JPG and DAC share the range but carry no size)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def image_size(stream):
+    """Read (width, height) from PNG/JPEG headers without decoding the image
+
+    Returns None if the header cannot be parsed. The stream position is restored.
+    """
+    start = stream.tell()
+    try:
+        head = stream.read(24)
+        if head[:8] == _PNG_SIGNATURE and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+
+        if head[:2] != b'\xff\xd8':
+            return None
+
+        # Walk JPEG segments until a start-of-frame marker
+        stream.seek(start + 2)
+        while True:
+            marker = stream.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            code = marker[1]
+            while code == 0xFF:  # fill bytes before the marker code
+                code = stream.read(1)[0]
+            if code == 0x01 or 0xD0 <= code <= 0xD8:  # markers without a length
+                continue
+            length, = struct.unpack('>H', stream.read(2))
+            if code in _JPEG_SOF_MARKERS:
+                _, height, width = struct.unpack('>BHH', stream.read(5))
+                return width, height
+            stream.seek(length - 2, os.SEEK_CUR)
+
+    except (struct.error, IndexError):
+        return None
+
+    finally:
+        stream.seek(start)
+
+# CSRF tokens are a signed copy of a random nonce kept in a small cookie,
+# so validation needs no server-side state and never touches the session
+CSRF_COOKIE_NAME = 'csrf_nonce'
+_csrf_serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'], salt='csrf-token')
+
+def generate_csrf_token(nonce):
+    """Generate CSRF token for forms, bound to the client's CSRF nonce"""
+    return _csrf_serializer.dumps(nonce)
 
 def validate_csrf_token(token):
     """Validate CSRF token"""
-    if not token or 'csrf_token' not in session:
+    nonce = request.cookies.get(CSRF_COOKIE_NAME)
+    if not token or not nonce:
+        return False
+
+    try:
+        signed_nonce = _csrf_serializer.loads(token, max_age=app.config['WTF_CSRF_TIME_LIMIT'])
+    except BadData:
+        return False
+
+    if not isinstance(signed_nonce, str):
         return False
 
     # Compare tokens securely
-    return secrets.compare_digest(token, session['csrf_token'])
+    return secrets.compare_digest(signed_nonce, nonce)
 
 def csrf_protected(f):
     """Decorator to protect routes with CSRF validation"""
@@ -165,37 +385,43 @@ def csrf_protected(f):
         if request.method in ['POST', 'PUT', 'DELETE', 'PATCH']:
             token = request.headers.get('X-CSRFToken') or request.form.get('csrf_token')
             if not validate_csrf_token(token):
-                return jsonify({'error': 'CSRF token validation failed'}), 403
+                return json_response(CSRF_FAILED_JSON, 403)
         return f(*args, **kwargs)
     return decorated_function
 
+_RATE_LOCK = threading.Lock()
+
 def rate_limit(max_requests=60, window=60):
-    """Simple rate limiting decorator"""
+    """Simple sliding-window rate limiting decorator (per process)"""
     def decorator(f):
+        # Request timestamps per client ip for this endpoint
+        buckets = {}
+        next_sweep = time.monotonic() + window
+
         @wraps(f)
         def decorated_function(*args, **kwargs):
+            nonlocal next_sweep
             client_ip = request.environ.get('REMOTE_ADDR', 'unknown')
+            now = time.monotonic()
 
-            if 'rate_limits' not in session:
-                session['rate_limits'] = {}
-
-            current_time = datetime.now()
-            key = f"{client_ip}_{request.endpoint}"
+            with _RATE_LOCK:
+                # Once per window, forget clients whose newest request has expired
+                if now >= next_sweep:
+                    stale = [ip for ip, bucket in buckets.items() if now - bucket[-1] >= window]
+                    for ip in stale:
+                        del buckets[ip]
+                    next_sweep = now + window
 
-            if key in session['rate_limits']:
-                requests = session['rate_limits'][key]
-                # Filter requests within the time window
-                recent_requests = [req_time for req_time in requests
-                                 if (current_time - req_time).seconds < window]
+                bucket = buckets.setdefault(client_ip, deque())
 
-                if len(recent_requests) >= max_requests:
-                    return jsonify({'error': 'Rate limit exceeded'}), 429
+                # Drop requests that fell out of the time window
+                while bucket and now - bucket[0] >= window:
+                    bucket.popleft()
 
-                session['rate_limits'][key] = recent_requests
-            else:
-                session['rate_limits'][key] = []
+                if len(bucket) >= max_requests:
+                    return json_response(RATE_LIMITED_JSON, 429)
 
-            session['rate_limits'][key].append(current_time)
+                bucket.append(now)
 
             return f(*args, **kwargs)
         return decorated_function
@@ -208,21 +434,8 @@ def secure_headers(f):
         response = f(*args, **kwargs)
 
         # Add security headers
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'DENY'
-        response.headers['X-XSS-Protection'] = '1; mode=block'
-        response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-        response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-        response.headers['Content-Security-Policy'] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline'; "
-            "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
-            "font-src 'self' https://fonts.gstatic.com; "
-            "img-src 'self' data: blob:; "
-            "media-src 'self' blob:; "
-            "connect-src 'self'; "
-            "frame-src 'none';"
-        )
+        for name, value in SECURE_HEADERS:
+            response.headers[name] = value
 
         return response
     return decorated_function
@@ -245,35 +458,26 @@ def log_security_event(event_type, details):
         except Exception as e:
             app.logger.error(f'Failed to send security webhook: {str(e)}')
 
+def conditional(response, etag, last_modified=None, weak=False):
+    """Attach cache validators and downgrade to 304 when the client copy is current"""
+    response.set_etag(etag, weak=weak)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response.make_conditional(request)
+
 # CORS headers configuration
 @app.after_request
 def after_request(response):
     """Add CORS and security headers to all responses"""
     # CORS Headers
-    response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-CSRFToken')
-    response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-    response.headers.add('Access-Control-Allow-Credentials', 'true')
+    response.headers.extend(CORS_HEADERS)
 
-    # Security Headers
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    response.headers['X-Frame-Options'] = 'DENY'
-    response.headers['X-XSS-Protection'] = '1; mode=block'
-    response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
+    # Security Headers (replace any value set by the view)
+    response.headers.update(DEFAULT_SECURITY_HEADERS)
 
     # Content Security Policy
     if app.config.get('ENVIRONMENT') == 'production':
-        csp = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline'; "
-            "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
-            "font-src 'self' https://fonts.gstatic.com; "
-            "img-src 'self' data: blob:; "
-            "media-src 'self' blob:; "
-            "connect-src 'self'; "
-            "frame-src 'none';"
-        )
-        response.headers['Content-Security-Policy'] = csp
+        response.headers['Content-Security-Policy'] = CONTENT_SECURITY_POLICY
 
     return response
 
@@ -303,33 +507,32 @@ def upload_file():
     """Handle file upload with validation"""
     try:
         if 'file' not in request.files:
-            return jsonify({
-                'success': False,
-                'error': 'No file provided',
-                'error_code': 'NO_FILE'
-            }), 400
+            return json_response(NO_FILE_JSON, 400)
 
         file = request.files['file']
         if file.filename == '':
-            return jsonify({
-                'success': False,
-                'error': 'No file selected',
-                'error_code': 'NO_FILE'
-            }), 400
+            return json_response(NO_FILE_SELECTED_JSON, 400)
 
         if file and allowed_file(file.filename):
             # Secure filename handling
-            filename = secure_filename(file.filename)
+            filename = cached_secure_filename(file.filename)
             timestamp = str(int(time.time()))
             filename = f"upload_{timestamp}_{filename}"
 
+            # Get image dimensions from the in-memory upload, falling back to PIL
+            dimensions = image_size(file.stream)
+            if dimensions is None:
+                with Image.open(file.stream) as img:
+                    dimensions = img.size
+                file.stream.seek(0)
+            width, height = dimensions
+
             # Save file
             file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
+            file.save(file_path, buffer_size=UPLOAD_BUFFER_SIZE)
 
-            # Get image dimensions
-            with Image.open(file_path) as img:
-                width, height = img.size
+            # save() copies the stream to its end, so its position is the size
+            file_size = file.stream.tell()
 
             return jsonify({
                 'success': True,
@@ -337,209 +540,261 @@ def upload_file():
                 'original_name': file.filename,
                 'width': width,
                 'height': height,
-                'file_size': os.path.getsize(file_path),
+                'file_size': file_size,
                 'mime_type': file.mimetype
             })
 
-        return jsonify({
-            'success': False,
-            'error': 'Invalid file type. Only JPG and PNG files are allowed.',
-            'error_code': 'INVALID_FILE_TYPE'
-        }), 400
+        return json_response(INVALID_FILE_TYPE_JSON, 400)
 
     except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': 'File processing failed. Please try again.',
-            'error_code': 'PROCESSING_ERROR'
-        }), 500
+        return json_response(PROCESSING_ERROR_JSON, 500)
+
+# Frame catalogue served by /frames
+FRAMES = [
+    {
+        'id': 'aviator_classic',
+        'name': 'Classic Aviator',
+        'category': 'classic',
+        'subcategory': 'pilot',
+        'description': 'Timeless aviator style with metal frame, perfect for a sophisticated look',
+        'long_description': 'Inspired by classic pilot sunglasses, this frame features teardrop-shaped lenses with a thin metal frame. Ideal for oval and heart-shaped faces.',
+        'image_url': '/static/frames/aviator_classic.png',
+        'thumbnail_url': '/static/frames/aviator_classic_thumb.png',
+        'tags': ['classic', 'metal', 'pilot', 'teardrop', 'sophisticated'],
+        'default_width': 300,
+        'default_height': 100,
+        'default_x': 400,
+        'default_y': 200,
+        'price_range': 'premium',
+        'material': 'Metal Alloy',
+        'colors': ['gold', 'silver', 'gunmetal'],
+        'suitable_for': ['oval', 'heart', 'round'],
+        'popularity': 85,
+        'new_arrival': False,
+        'bestseller': True,
+        'seasonal': ['all'],
+        'try_on_count': 1247,
+        'rating': 4.7
+    },
+    {
+        'id': 'round_vintage',
+        'name': 'Round Vintage',
+        'category': 'vintage',
+        'subcategory': 'retro',
+        'description': 'Classic round frame design with vintage appeal',
+        'long_description': 'A retro-inspired round frame that brings back the charm of vintage eyewear. Perfect for square and rectangular face shapes.',
+        'image_url': '/static/frames/round_vintage.png',
+        'thumbnail_url': '/static/frames/round_vintage_thumb.png',
+        'tags': ['vintage', 'round', 'retro', 'acetate', 'tortoise'],
+        'default_width': 280,
+        'default_height': 120,
+        'default_x': 410,
+        'default_y': 190,
+        'price_range': 'standard',
+        'material': 'Acetate',
+        'colors': ['tortoise', 'black', 'clear'],
+        'suitable_for': ['square', 'rectangle', 'diamond'],
+        'popularity': 72,
+        'new_arrival': True,
+        'bestseller': False,
+        'seasonal': ['fall', 'winter'],
+        'try_on_count': 892,
+        'rating': 4.5
+    },
+    {
+        'id': 'sport_modern',
+        'name': 'Sport Modern',
+        'category': 'sport',
+        'subcategory': 'active',
+        'description': 'Modern sport frame with wraparound design for active lifestyle',
+        'long_description': 'High-performance sport sunglasses with wraparound design providing maximum coverage and protection. Lightweight and durable for any outdoor activity.',
+        'image_url': '/static/frames/sport_modern.png',
+        'thumbnail_url': '/static/frames/sport_modern_thumb.png',
+        'tags': ['sport', 'modern', 'wraparound', 'polarized', 'lightweight'],
+        'default_width': 320,
+        'default_height': 90,
+        'default_x': 390,
+        'default_y': 210,
+        'price_range': 'premium',
+        'material': 'Polycarbonate',
+        'colors': ['matte_black', 'gloss_black', 'white'],
+        'suitable_for': ['all'],
+        'popularity': 68,
+        'new_arrival': True,
+        'bestseller': False,
+        'seasonal': ['spring', 'summer', 'fall'],
+        'try_on_count': 654,
+        'rating': 4.3
+    },
+    {
+        'id': 'cat_eye_trendy',
+        'name': 'Cat Eye Trendy',
+        'category': 'fashion',
+        'subcategory': 'cat_eye',
+        'description': 'Fashionable cat-eye frame with upswept corners',
+        'long_description': 'A trendy cat-eye frame that combines vintage elegance with modern fashion. Perfect for making a style statement with angular, upswept corners.',
+        'image_url': '/static/frames/cat_eye_trendy.png',
+        'thumbnail_url': '/static/frames/cat_eye_trendy_thumb.png',
+        'tags': ['cat_eye', 'fashion', 'trendy', 'upswept', 'statement'],
+        'default_width': 310,
+        'default_height': 110,
+        'default_x': 400,
+        'default_y': 180,
+        'price_range': 'designer',
+        'material': 'Mixed Materials',
+        'colors': ['burgundy', 'black', 'tortoise'],
+        'suitable_for': ['oval', 'heart', 'round'],
+        'popularity': 91,
+        'new_arrival': True,
+        'bestseller': True,
+        'seasonal': ['fall', 'winter', 'spring'],
+        'try_on_count': 1456,
+        'rating': 4.8
+    },
+    {
+        'id': 'wayfarer_classic',
+        'name': 'Wayfarer Classic',
+        'category': 'classic',
+        'subcategory': 'iconic',
+        'description': 'Iconic wayfarer style with trapezoidal shape',
+        'long_description': 'The timeless wayfarer design that never goes out of style. Bold trapezoidal shape with distinctive hinge details make this an instant classic.',
+        'image_url': '/static/frames/wayfarer_classic.png',
+        'thumbnail_url': '/static/frames/wayfarer_classic_thumb.png',
+        'tags': ['wayfarer', 'classic', 'iconic', 'trapezoidal', 'bold'],
+        'default_width': 330,
+        'default_height': 95,
+        'default_x': 400,
+        'default_y': 205,
+        'price_range': 'standard',
+        'material': 'Acetate',
+        'colors': ['black', 'tortoise', 'crystal_clear'],
+        'suitable_for': ['round', 'square', 'heart'],
+        'popularity': 94,
+        'new_arrival': False,
+        'bestseller': True,
+        'seasonal': ['all'],
+        'try_on_count': 1893,
+        'rating': 4.9
+    },
+    {
+        'id': 'minimalist_rimless',
+        'name': 'Minimalist Rimless',
+        'category': 'minimalist',
+        'subcategory': 'rimless',
+        'description': 'Ultra-lightweight rimless frame for subtle elegance',
+        'long_description': 'Nearly invisible rimless design that puts the focus entirely on your eyes. Ultra-lightweight construction for all-day comfort with sophisticated minimalism.',
+        'image_url': '/static/frames/minimalist_rimless.png',
+        'thumbnail_url': '/static/frames/minimalist_rimless_thumb.png',
+        'tags': ['rimless', 'minimalist', 'lightweight', 'subtle', 'professional'],
+        'default_width': 270,
+        'default_height': 100,
+        'default_x': 415,
+        'default_y': 200,
+        'price_range': 'luxury',
+        'material': 'Titanium',
+        'colors': ['silver', 'gold', 'rose_gold', 'gunmetal'],
+        'suitable_for': ['oval', 'round', 'heart'],
+        'popularity': 63,
+        'new_arrival': False,
+        'bestseller': False,
+        'seasonal': ['all'],
+        'try_on_count': 421,
+        'rating': 4.6
+    }
+]
+
+# The catalogue never changes at runtime, so serialize it once at import time
+_FRAMES_JSON = json_dumps({'success': True, 'frames': FRAMES})
+_FRAMES_ETAG = hashlib.md5(_FRAMES_JSON).hexdigest()
+
+# Pre-compressed variants of the catalogue, in order of preference
+_FRAMES_ENCODED = [('gzip', gzip.compress(_FRAMES_JSON, compresslevel=9, mtime=0))]
+if brotli is not None:
+    _FRAMES_ENCODED.insert(0, ('br', brotli.compress(_FRAMES_JSON, quality=11)))
 
 @app.route('/frames')
 def get_frames():
     """Get available frame configurations with enhanced metadata"""
-    frames = [
-        {
-            'id': 'aviator_classic',
-            'name': 'Classic Aviator',
-            'category': 'classic',
-            'subcategory': 'pilot',
-            'description': 'Timeless aviator style with metal frame, perfect for a sophisticated look',
-            'long_description': 'Inspired by classic pilot sunglasses, this frame features teardrop-shaped lenses with a thin metal frame. Ideal for oval and heart-shaped faces.',
-            'image_url': '/static/frames/aviator_classic.png',
-            'thumbnail_url': '/static/frames/aviator_classic_thumb.png',
-            'tags': ['classic', 'metal', 'pilot', 'teardrop', 'sophisticated'],
-            'default_width': 300,
-            'default_height': 100,
-            'default_x': 400,
-            'default_y': 200,
-            'price_range': 'premium',
-            'material': 'Metal Alloy',
-            'colors': ['gold', 'silver', 'gunmetal'],
-            'suitable_for': ['oval', 'heart', 'round'],
-            'popularity': 85,
-            'new_arrival': False,
-            'bestseller': True,
-            'seasonal': ['all'],
-            'try_on_count': 1247,
-            'rating': 4.7
-        },
-        {
-            'id': 'round_vintage',
-            'name': 'Round Vintage',
-            'category': 'vintage',
-            'subcategory': 'retro',
-            'description': 'Classic round frame design with vintage appeal',
-            'long_description': 'A retro-inspired round frame that brings back the charm of vintage eyewear. Perfect for square and rectangular face shapes.',
-            'image_url': '/static/frames/round_vintage.png',
-            'thumbnail_url': '/static/frames/round_vintage_thumb.png',
-            'tags': ['vintage', 'round', 'retro', 'acetate', 'tortoise'],
-            'default_width': 280,
-            'default_height': 120,
-            'default_x': 410,
-            'default_y': 190,
-            'price_range': 'standard',
-            'material': 'Acetate',
-            'colors': ['tortoise', 'black', 'clear'],
-            'suitable_for': ['square', 'rectangle', 'diamond'],
-            'popularity': 72,
-            'new_arrival': True,
-            'bestseller': False,
-            'seasonal': ['fall', 'winter'],
-            'try_on_count': 892,
-            'rating': 4.5
-        },
-        {
-            'id': 'sport_modern',
-            'name': 'Sport Modern',
-            'category': 'sport',
-            'subcategory': 'active',
-            'description': 'Modern sport frame with wraparound design for active lifestyle',
-            'long_description': 'High-performance sport sunglasses with wraparound design providing maximum coverage and protection. Lightweight and durable for any outdoor activity.',
-            'image_url': '/static/frames/sport_modern.png',
-            'thumbnail_url': '/static/frames/sport_modern_thumb.png',
-            'tags': ['sport', 'modern', 'wraparound', 'polarized', 'lightweight'],
-            'default_width': 320,
-            'default_height': 90,
-            'default_x': 390,
-            'default_y': 210,
-            'price_range': 'premium',
-            'material': 'Polycarbonate',
-            'colors': ['matte_black', 'gloss_black', 'white'],
-            'suitable_for': ['all'],
-            'popularity': 68,
-            'new_arrival': True,
-            'bestseller': False,
-            'seasonal': ['spring', 'summer', 'fall'],
-            'try_on_count': 654,
-            'rating': 4.3
-        },
-        {
-            'id': 'cat_eye_trendy',
-            'name': 'Cat Eye Trendy',
-            'category': 'fashion',
-            'subcategory': 'cat_eye',
-            'description': 'Fashionable cat-eye frame with upswept corners',
-            'long_description': 'A trendy cat-eye frame that combines vintage elegance with modern fashion. Perfect for making a style statement with angular, upswept corners.',
-            'image_url': '/static/frames/cat_eye_trendy.png',
-            'thumbnail_url': '/static/frames/cat_eye_trendy_thumb.png',
-            'tags': ['cat_eye', 'fashion', 'trendy', 'upswept', 'statement'],
-            'default_width': 310,
-            'default_height': 110,
-            'default_x': 400,
-            'default_y': 180,
-            'price_range': 'designer',
-            'material': 'Mixed Materials',
-            'colors': ['burgundy', 'black', 'tortoise'],
-            'suitable_for': ['oval', 'heart', 'round'],
-            'popularity': 91,
-            'new_arrival': True,
-            'bestseller': True,
-            'seasonal': ['fall', 'winter', 'spring'],
-            'try_on_count': 1456,
-            'rating': 4.8
-        },
-        {
-            'id': 'wayfarer_classic',
-            'name': 'Wayfarer Classic',
-            'category': 'classic',
-            'subcategory': 'iconic',
-            'description': 'Iconic wayfarer style with trapezoidal shape',
-            'long_description': 'The timeless wayfarer design that never goes out of style. Bold trapezoidal shape with distinctive hinge details make this an instant classic.',
-            'image_url': '/static/frames/wayfarer_classic.png',
-            'thumbnail_url': '/static/frames/wayfarer_classic_thumb.png',
-            'tags': ['wayfarer', 'classic', 'iconic', 'trapezoidal', 'bold'],
-            'default_width': 330,
-            'default_height': 95,
-            'default_x': 400,
-            'default_y': 205,
-            'price_range': 'standard',
-            'material': 'Acetate',
-            'colors': ['black', 'tortoise', 'crystal_clear'],
-            'suitable_for': ['round', 'square', 'heart'],
-            'popularity': 94,
-            'new_arrival': False,
-            'bestseller': True,
-            'seasonal': ['all'],
-            'try_on_count': 1893,
-            'rating': 4.9
-        },
-        {
-            'id': 'minimalist_rimless',
-            'name': 'Minimalist Rimless',
-            'category': 'minimalist',
-            'subcategory': 'rimless',
-            'description': 'Ultra-lightweight rimless frame for subtle elegance',
-            'long_description': 'Nearly invisible rimless design that puts the focus entirely on your eyes. Ultra-lightweight construction for all-day comfort with sophisticated minimalism.',
-            'image_url': '/static/frames/minimalist_rimless.png',
-            'thumbnail_url': '/static/frames/minimalist_rimless_thumb.png',
-            'tags': ['rimless', 'minimalist', 'lightweight', 'subtle', 'professional'],
-            'default_width': 270,
-            'default_height': 100,
-            'default_x': 415,
-            'default_y': 200,
-            'price_range': 'luxury',
-            'material': 'Titanium',
-            'colors': ['silver', 'gold', 'rose_gold', 'gunmetal'],
-            'suitable_for': ['oval', 'round', 'heart'],
-            'popularity': 63,
-            'new_arrival': False,
-            'bestseller': False,
-            'seasonal': ['all'],
-            'try_on_count': 421,
-            'rating': 4.6
-        }
-    ]
-
-    return jsonify({'success': True, 'frames': frames})
+    body, etag = _FRAMES_JSON, _FRAMES_ETAG
+    response = Response(mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    response.vary.add('Accept-Encoding')
+
+    for encoding, compressed in _FRAMES_ENCODED:
+        if request.accept_encodings[encoding]:
+            body, etag = compressed, f'{_FRAMES_ETAG}-{encoding}'
+            response.content_encoding = encoding
+            break
+
+    response.set_data(body)
+    return conditional(response, etag)
 
 @app.route('/static/uploads/<filename>')
 def uploaded_file(filename):
     """Serve uploaded files"""
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    # Resolve like send_from_directory does, relative to the app rather than the cwd
+    upload_dir = os.path.join(app.root_path, app.config['UPLOAD_FOLDER'])
+    file_path = safe_join(upload_dir, filename)
+    if file_path is None:
+        abort(404)
+
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        abort(404)
+
+    # Weak validator derived from mtime and size, nginx-style
+    etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+    last_modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+
+    # Answer revalidation requests without opening the file
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return conditional(Response(), etag, last_modified, weak=True)
+
+    # Let nginx stream the file from its internal location
+    accel_prefix = app.config.get('X_ACCEL_REDIRECT_PREFIX')
+    if accel_prefix:
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(filename)
+        return conditional(response, etag, last_modified, weak=True)
+
+    # Emits X-Sendfile instead of the body when USE_X_SENDFILE is enabled
+    response = send_from_directory(upload_dir, filename, etag=False)
+    return conditional(response, etag, last_modified, weak=True)
 
 @app.route('/csrf-token')
 @secure_headers
 def get_csrf_token():
     """Get CSRF token for forms"""
-    return jsonify({'csrf_token': generate_csrf_token()})
+    nonce = request.cookies.get(CSRF_COOKIE_NAME) or secrets.token_urlsafe(16)
+    response = jsonify({'csrf_token': generate_csrf_token(nonce)})
+    response.set_cookie(
+        CSRF_COOKIE_NAME,
+        nonce,
+        max_age=app.config['WTF_CSRF_TIME_LIMIT'],
+        secure=app.config['SESSION_COOKIE_SECURE'],
+        httponly=True,
+        samesite=app.config['SESSION_COOKIE_SAMESITE'],
+    )
+    return response
 
 @app.route('/api/security-event', methods=['POST'])
 @csrf_protected
 @rate_limit(max_requests=10, window=60)
 @secure_headers
-def log_security_event():
+def security_event_endpoint():
     """Log security events for monitoring"""
     try:
         data = request.get_json()
         if not data:
-            return jsonify({'error': 'Invalid request data'}), 400
+            return json_response(INVALID_REQUEST_DATA_JSON, 400)
 
         # Validate and sanitize input
         event_type = sanitize_input(data.get('event_type', ''))
         details = data.get('details', {})
 
         if not event_type:
-            return jsonify({'error': 'Event type is required'}), 400
+            return json_response(EVENT_TYPE_REQUIRED_JSON, 400)
 
         # Log security event
         log_security_event(event_type, details)
@@ -547,20 +802,20 @@ def log_security_event():
         return jsonify({'success': True, 'message': 'Security event logged'})
 
     except Exception as e:
-        return jsonify({'error': 'Failed to log security event'}), 500
+        return json_response(SECURITY_EVENT_FAILED_JSON, 500)
 
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'success': False, 'error': 'Page not found', 'error_code': 'NOT_FOUND'}), 404
+    return json_response(NOT_FOUND_JSON, 404)
 
 @app.errorhandler(413)
 def too_large(error):
-    return jsonify({'success': False, 'error': 'File too large', 'error_code': 'FILE_TOO_LARGE'}), 413
+    return json_response(FILE_TOO_LARGE_JSON, 413)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'success': False, 'error': 'Internal server error', 'error_code': 'INTERNAL_ERROR'}), 500
+    return json_response(INTERNAL_ERROR_JSON, 500)
 
 if __name__ == '__main__':
     # Development server configuration